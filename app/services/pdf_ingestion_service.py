@@ -2,26 +2,57 @@
 Service for ingesting PDFs into the RAG system.
 """
 
+import asyncio
 import logging
 import os
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, Tuple
 
 from app.services.rag_service import rag_service
 from app.services.pdf_processor import PDFProcessor
 
 logger = logging.getLogger(__name__)
 
-async def load_pdfs_from_folder(pdf_folder: str) -> Dict[str, int]:
+# Files read and extracted at the same time; bounds how many raw PDFs sit in
+# memory at once independently of batch_size
+MAX_CONCURRENT_EXTRACTIONS = 4
+
+def _read_and_extract(pdf_processor: PDFProcessor, pdf_file: Path) -> Tuple[str, Dict[str, Any]]:
+    """Read one PDF from disk and extract its text and metadata."""
+    with open(pdf_file, "rb") as f:
+        pdf_content = f.read()
+    return pdf_processor.extract_text_from_pdf(pdf_content)
+
+
+async def _bounded_read_and_extract(
+    limit: asyncio.Semaphore, pdf_processor: PDFProcessor, pdf_file: Path
+) -> Tuple[str, Dict[str, Any]]:
+    async with limit:
+        return await asyncio.to_thread(_read_and_extract, pdf_processor, pdf_file)
+
+
+async def load_pdfs_from_folder(pdf_folder: str, batch_size: int = 32) -> Dict[str, int]:
     """
     Load all PDFs from a folder into the RAG vector store.
+
+    PDFs are handled in batches: the files of a batch are read and extracted
+    in worker threads, at most MAX_CONCURRENT_EXTRACTIONS at a time, and the
+    resulting documents are sent to the vector store in a single
+    add_documents call.
     
     Args:
         pdf_folder: Path to folder containing PDFs
+        batch_size: Number of PDFs per extraction/add_documents batch
         
     Returns:
         Dictionary with stats (total, success, failed, skipped)
+
+    Raises:
+        ValueError: If batch_size is less than 1
     """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
     pdf_folder = Path(pdf_folder)
     
     if not pdf_folder.exists():
@@ -39,57 +70,80 @@ async def load_pdfs_from_folder(pdf_folder: str) -> Dict[str, int]:
     
     stats = {"total": len(pdf_files), "success": 0, "failed": 0, "skipped": 0}
     pdf_processor = PDFProcessor()
+    limit = asyncio.Semaphore(MAX_CONCURRENT_EXTRACTIONS)
     
-    for i, pdf_file in enumerate(pdf_files, 1):
-        try:
+    for start in range(0, len(pdf_files), batch_size):
+        batch_files = pdf_files[start:start + batch_size]
+
+        # Read and extract the whole batch off the event loop
+        extracted = await asyncio.gather(
+            *(_bounded_read_and_extract(limit, pdf_processor, f) for f in batch_files),
+            return_exceptions=True,
+        )
+
+        documents = []
+        for i, (pdf_file, result) in enumerate(zip(batch_files, extracted), start + 1):
             logger.info(f"[{i}/{len(pdf_files)}] Processing: {pdf_file.name}")
-            
-            # Read PDF file
-            with open(pdf_file, "rb") as f:
-                pdf_content = f.read()
-            
-            # Extract text
-            text, metadata = pdf_processor.extract_text_from_pdf(pdf_content)
-            
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                # Cancellation and interpreter exits are not per-file errors
+                raise result
+            if isinstance(result, Exception):
+                logger.error(f"Error processing {pdf_file.name}: {str(result)}")
+                stats["failed"] += 1
+                continue
+
+            text, metadata = result
             if not text or len(text.strip()) < 100:
                 logger.warning(f"Skipped (insufficient text): {pdf_file.name}")
                 stats["skipped"] += 1
                 continue
-            
-            # Classify legal document via LLM
-            logger.info(f"Classifying: {pdf_file.name} using LLM...")
-            classification = await pdf_processor.classify_legal_document(text)
-            
-            # Prepare document
-            document = {
-                "id": f"pdf_{pdf_file.stem}",
-                "content": text,
-                "source": f"pdf:{pdf_file.name}",
-                "metadata": {
-                    "filename": pdf_file.name,
-                    "size_bytes": pdf_file.stat().st_size,
-                    "pages": len(text.split("\n\n")),  # Rough estimate
-                    "document_type": classification.get("document_type", "Other"),
-                    "legal_domain": classification.get("legal_domain", "Other"),
-                    "jurisdiction": classification.get("jurisdiction", "Other"),
-                    "summary": classification.get("summary", "Legal document."),
-                    **metadata
-                }
-            }
-            
-            # Add to RAG
-            result = await rag_service.add_documents([document])
-            
-            if result.get("added", 0) > 0:
-                logger.info(f"Added to RAG: {pdf_file.name} ({len(text)} chars)")
-                stats["success"] += 1
-            else:
-                logger.warning(f"Failed to add: {pdf_file.name}")
-                stats["failed"] += 1
+
+            try:
+                # Classify legal document via LLM
+                logger.info(f"Classifying: {pdf_file.name} using LLM...")
+                classification = await pdf_processor.classify_legal_document(text)
                 
+                # Prepare document
+                documents.append({
+                    "id": f"pdf_{pdf_file.stem}",
+                    "content": text,
+                    "source": f"pdf:{pdf_file.name}",
+                    "metadata": {
+                        "filename": pdf_file.name,
+                        "size_bytes": pdf_file.stat().st_size,
+                        "pages": len(text.split("\n\n")),  # Rough estimate
+                        "document_type": classification.get("document_type", "Other"),
+                        "legal_domain": classification.get("legal_domain", "Other"),
+                        "jurisdiction": classification.get("jurisdiction", "Other"),
+                        "summary": classification.get("summary", "Legal document."),
+                        **metadata
+                    }
+                })
+            except Exception as e:
+                logger.error(f"Error processing {pdf_file.name}: {str(e)}")
+                stats["failed"] += 1
+
+        if not documents:
+            continue
+
+        # Add the batch to RAG; documents the store did not add (e.g. duplicates) count as failed
+        try:
+            result = await rag_service.add_documents(documents)
+            added = result.get("added", 0)
         except Exception as e:
-            logger.error(f"Error processing {pdf_file.name}: {str(e)}")
-            stats["failed"] += 1
+            # Retry one by one so a single bad document does not fail its whole batch
+            logger.warning(f"Error adding batch of {len(documents)} PDFs to RAG, retrying individually: {str(e)}")
+            added = 0
+            for document in documents:
+                try:
+                    result = await rag_service.add_documents([document])
+                    added += result.get("added", 0)
+                except Exception as e:
+                    logger.error(f"Error adding {document['source']} to RAG: {str(e)}")
+
+        logger.info(f"Added to RAG: {added}/{len(documents)} PDFs in batch")
+        stats["success"] += added
+        stats["failed"] += len(documents) - added
     
     return stats
 
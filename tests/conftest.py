@@ -1,18 +1,30 @@
 import sys
 import inspect
+import itertools
+import operator
+import pkgutil
+from collections import defaultdict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
 from unittest.mock import MagicMock
 from functools import wraps
 from datetime import datetime, timezone
 from fastapi import FastAPI
 
-# Mock heavy dependencies globally for all tests if not already mocked
+# Mock heavy dependencies once for the whole session, before any app import
 for mod_name in ["faiss", "sentence_transformers"]:
     if mod_name not in sys.modules:
         mock_mod = MagicMock()
         mock_mod.__spec__ = MagicMock()
         sys.modules[mod_name] = mock_mod
 
+import httpx
+import pytest
+from google.api_core.exceptions import NotFound
 from fastapi import Request
+from fastapi.testclient import TestClient
+# The one cold import of the application: conftest loads before any test
+# module, so their own ``from app.main import app`` is a sys.modules hit.
 from app.main import app
 from app.dependencies import get_current_user, get_optional_user
 
@@ -132,3 +144,344 @@ def wrapped_public_validate(cls, obj, *args, **kwargs):
         obj = MockUserDict(obj)
     return original_public_validate(obj, *args, **kwargs)
 PublicUserResponse.model_validate = classmethod(wrapped_public_validate)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Single TestClient shared by the whole session.
+
+    Not entered as a context manager on purpose: the app lifespan starts the
+    RAG scheduler, which the mocked tests never need. No Authorization header
+    is sent: callers authenticate through dependency overrides, so anything
+    reading the header itself (e.g. get_optional_user) sees an anonymous
+    request.
+    """
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+async def aclient():
+    """Async counterpart of ``client`` that drives the app in-process on the
+    session event loop, without TestClient's worker-thread portal."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport,
+        base_url="http://testserver",
+        follow_redirects=True,
+    ) as c:
+        yield c
+
+
+@pytest.fixture(autouse=True)
+def _reset_overrides():
+    """Drop every dependency override a test installed, keeping the same dict."""
+    yield
+    app.dependency_overrides.clear()
+
+
+# Route modules whose firebase_service is swapped for the shared in-memory fake
+FAKE_FIREBASE_MODULES = (
+    "app.api.routes.analytics",
+    "app.api.routes.bookings",
+    "app.api.routes.cases",
+    "app.api.routes.communication",
+    "app.api.routes.lawyers",
+    "app.api.routes.organizations",
+)
+
+
+# Comparison operators accepted in query_collection filter tuples
+_QUERY_OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda field_value, value: field_value in value,
+    "array_contains": lambda field_value, value: value in (field_value or []),
+}
+
+
+class DocumentStore(MutableMapping):
+    """Path-keyed documents bucketed by collection with equality indexes.
+
+    Every write files the document under ``collections[collection][doc_id]``
+    and records each hashable top-level field in
+    ``indexes[(collection, field, value)]``, so equality queries touch only
+    the matching ids instead of scanning the whole store. Documents live in
+    a private dict, so every mapping method goes through the indexing
+    ``__setitem__``/``__delitem__``.
+    """
+
+    def __init__(self):
+        self._docs = {}
+        self.collections = defaultdict(dict)
+        self.indexes = defaultdict(set)
+        self._index_keys = {}
+        self._seq = {}
+        self._next_seq = itertools.count()
+
+    @staticmethod
+    def _split(path):
+        collection, _, doc_id = path.rpartition("/")
+        return collection, doc_id
+
+    def __getitem__(self, path):
+        return self._docs[path]
+
+    def __iter__(self):
+        return iter(self._docs)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __setitem__(self, path, data):
+        collection, doc_id = self._split(path)
+        self._drop_index_keys(path, doc_id)
+        self._docs[path] = data
+        # Rewrites keep the document's original position in the collection
+        self.collections[collection][doc_id] = data
+        if path not in self._seq:
+            self._seq[path] = next(self._next_seq)
+        keys = set()
+        for field, value in data.items():
+            try:
+                key = (collection, field, value)
+                self.indexes[key].add(doc_id)
+            except TypeError:  # unhashable values (lists, dicts) aren't indexed
+                continue
+            keys.add(key)
+        self._index_keys[path] = keys
+
+    def __delitem__(self, path):
+        self._unindex(path)
+        del self._docs[path]
+
+    def clear(self):
+        self._docs.clear()
+        self.collections.clear()
+        self.indexes.clear()
+        self._index_keys.clear()
+        self._seq.clear()
+
+    def _drop_index_keys(self, path, doc_id):
+        for key in self._index_keys.pop(path, ()):
+            self.indexes[key].discard(doc_id)
+
+    def _unindex(self, path):
+        if path not in self:
+            return
+        collection, doc_id = self._split(path)
+        self._drop_index_keys(path, doc_id)
+        self.collections[collection].pop(doc_id, None)
+        self._seq.pop(path, None)
+
+    def query(self, collection, filters):
+        """Return ``(doc_id, data)`` pairs matching ``(field, op, value)`` filters.
+
+        ``data`` is a copy, so callers editing it cannot corrupt the stored
+        document or leave the indexes stale. Equality filters intersect index
+        sets; the other operators are then checked against that (usually
+        small) candidate set only.
+        """
+        bucket = self.collections.get(collection, {})
+        if not filters:
+            return [(doc_id, dict(data)) for doc_id, data in bucket.items()]
+        candidates = None
+        remaining = []
+        for field, op, value in filters:
+            if op == "==":
+                try:
+                    ids = self.indexes.get((collection, field, value), set())
+                except TypeError:
+                    remaining.append((field, op, value))
+                    continue
+                candidates = set(ids) if candidates is None else candidates & ids
+            else:
+                remaining.append((field, op, value))
+        if candidates is None:
+            doc_ids = list(bucket)
+        else:
+            doc_ids = sorted(candidates, key=lambda d: self._seq[f"{collection}/{d}"])
+        return [
+            (doc_id, dict(bucket[doc_id]))
+            for doc_id in doc_ids
+            if all(_QUERY_OPS[op](bucket[doc_id].get(field), value) for field, op, value in remaining)
+        ]
+
+
+class FakeFirebase:
+    """In-memory stand-in for the firebase_service calls made by the route tests.
+
+    Documents live in ``store`` (a DocumentStore) keyed by Firestore path and
+    are handed out as copies, like real snapshots. Tests may still assign
+    AsyncMocks to individual methods; ``reset()`` drops those overrides along
+    with the stored data.
+    """
+
+    _STATE = ("store", "messages")
+
+    # Raw Firestore client; tests that stream collections assign their own
+    db = None
+
+    def __init__(self):
+        self.store = DocumentStore()
+        self.messages = []
+
+    def reset(self):
+        self.store.clear()
+        self.messages.clear()
+        for name in list(vars(self)):
+            if name not in self._STATE:
+                delattr(self, name)
+
+    async def get_document(self, path):
+        data = self.store.get(path)
+        return dict(data) if data is not None else None
+
+    async def set_document(self, path, data):
+        self.store[path] = dict(data)
+
+    async def update_document(self, path, data):
+        # Firestore's update() refuses to create a missing document
+        if path not in self.store:
+            raise NotFound(f"No document to update: {path}")
+        self.store[path] = {**self.store[path], **data}
+
+    async def delete_document(self, path):
+        self.store.pop(path, None)
+
+    async def query_collection(self, collection_name, filters=None, limit=None, offset=None, **kwargs):
+        if isinstance(filters, dict):
+            filters = [(k, "==", v) for k, v in filters.items()]
+        docs = self.store.query(collection_name, filters or [])
+        start = offset or 0
+        stop = start + limit if limit else None
+        return list(itertools.islice(docs, start, stop)), len(docs)
+
+    async def get_user_by_uid(self, uid):
+        return None
+
+    async def add_direct_message(self, message):
+        if not message.id:
+            message.id = f"msg_{len(self.messages) + 1}"
+        self.messages.append(message)
+        return message
+
+    async def get_direct_messages(self, user1_id, user2_id, limit=50):
+        pair = {user1_id, user2_id}
+        msgs = [m for m in self.messages if {m.sender_id, m.receiver_id} == pair]
+        msgs.sort(key=lambda m: m.timestamp)
+        return msgs[:limit]
+
+
+# Checked once per session: every method the fake stands in for exists on the
+# real service, so tests can monkeypatch either with the default raising=True.
+from app.services.firebase_service import FirebaseService
+
+_missing = sorted(
+    name
+    for name, attr in vars(FakeFirebase).items()
+    if inspect.iscoroutinefunction(attr) and not hasattr(FirebaseService, name)
+)
+if _missing:
+    raise RuntimeError(f"FakeFirebase implements methods FirebaseService does not have: {_missing}")
+
+
+def patch_firebase_everywhere(monkeypatch, fake, modules=FAKE_FIREBASE_MODULES):
+    """Rebind ``firebase_service`` to ``fake`` in each of ``modules``.
+
+    Route modules import the singleton by name, so patching
+    app.services.firebase_service alone would not reach them.
+    """
+    for module in modules:
+        monkeypatch.setattr(f"{module}.firebase_service", fake)
+
+
+@pytest.fixture(scope="session")
+def fake_firebase():
+    """Install one FakeFirebase on every route module in FAKE_FIREBASE_MODULES."""
+    fake = FakeFirebase()
+    with pytest.MonkeyPatch.context() as mp:
+        patch_firebase_everywhere(mp, fake)
+        yield fake
+
+
+@pytest.fixture(autouse=True)
+def _reset_fake_firebase(fake_firebase):
+    fake_firebase.reset()
+
+
+@pytest.fixture(scope="module")
+def _module_patch_owners():
+    """Dotted patch targets resolved to ``(owner, attribute)``, once per module."""
+    return {}
+
+
+@pytest.fixture
+def module_patch(_module_patch_owners, monkeypatch):
+    """``module_patch(target)`` replaces ``target`` with a fresh MagicMock for this test.
+
+    The dotted path is resolved and imported once per module; each test gets
+    its own mock, so stubs a test assigns never reach the next one.
+    """
+    def _patch(target):
+        if target not in _module_patch_owners:
+            owner_name, _, attribute = target.rpartition(".")
+            _module_patch_owners[target] = (pkgutil.resolve_name(owner_name), attribute)
+        owner, attribute = _module_patch_owners[target]
+        mock = MagicMock()
+        monkeypatch.setattr(owner, attribute, mock)
+        return mock
+
+    return _patch
+
+
+@pytest.fixture
+def as_user():
+    """Context manager overriding an auth dependency for the enclosed requests.
+
+    ``as_user(role, uid, **extra)`` authenticates as a plain user dict;
+    ``as_user(user=obj)`` hands out a prebuilt user (a User model or any
+    object the route accepts). ``dependency`` defaults to get_current_user
+    and is the only key touched; whatever was there before is restored on
+    exit. Pass neither a role nor a user for an anonymous caller.
+    """
+    @contextmanager
+    def _as_user(role=None, uid="u1", *, user=None, dependency=get_current_user, **extra):
+        if user is None and role is not None:
+            user = {"uid": uid, "role": role, **extra}
+        prev = app.dependency_overrides.get(dependency)
+        app.dependency_overrides[dependency] = lambda: user
+        try:
+            yield
+        finally:
+            if prev is not None:
+                app.dependency_overrides[dependency] = prev
+            else:
+                app.dependency_overrides.pop(dependency, None)
+
+    return _as_user
+
+
+@pytest.fixture
+def owner_profile():
+    """``(collection, role, uid, document)`` for as_owner/existing_profile; override per module."""
+    pytest.fail("override the owner_profile fixture in the test module")
+
+
+@pytest.fixture
+def as_owner(as_user, owner_profile):
+    """Authenticate as the non-admin owner of ``owner_profile`` for the whole test."""
+    _, role, uid, _ = owner_profile
+    with as_user(role, uid, is_admin=False):
+        yield
+
+
+@pytest.fixture
+def existing_profile(fake_firebase, owner_profile):
+    """Seed the ``owner_profile`` document and return its id."""
+    collection, _, uid, document = owner_profile
+    fake_firebase.store[f"{collection}/{uid}"] = dict(document)
+    return uid
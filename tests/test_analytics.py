@@ -1,8 +1,7 @@
-from fastapi.testclient import TestClient
-from app.main import app
+from types import SimpleNamespace
 
 
-def test_analytics_overview_and_cases(monkeypatch):
+def test_analytics_overview_and_cases(client, as_user, fake_firebase):
     # create a dummy in-memory DB like other tests
     class DummyDoc:
         def __init__(self, data, id_):
@@ -83,33 +82,21 @@ def test_analytics_overview_and_cases(monkeypatch):
     articles = dummy_db.collection("articles")
     articles.document("a1").set({"title": "One"})
 
-    from app.services.firebase_service import firebase_service
-
-    firebase_service.db = dummy_db
+    fake_firebase.db = dummy_db
 
     # override auth as admin
-    from app.dependencies import get_current_user
-    from types import SimpleNamespace
-
-    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(
-        uid="admin", role="admin"
-    )
-
-    client = TestClient(app)
-
-    r = client.get("/api/analytics/overview")
-    assert r.status_code == 200
-    body = r.json()
-    assert body["totalUsers"] == 2
-    assert body["totalLawyers"] == 1
-    assert body["totalCases"] == 3
-    assert body["totalBookings"] == 1
-    assert body["totalArticles"] == 1
-
-    r2 = client.get("/api/analytics/cases/status")
-    assert r2.status_code == 200
-    counts = r2.json()["counts"]
-    assert counts.get("open") == 2
-    assert counts.get("closed") == 1
-
-    app.dependency_overrides.clear()
+    with as_user(user=SimpleNamespace(uid="admin", role="admin")):
+        r = client.get("/api/analytics/overview")
+        assert r.status_code == 200
+        body = r.json()
+        assert body["totalUsers"] == 2
+        assert body["totalLawyers"] == 1
+        assert body["totalCases"] == 3
+        assert body["totalBookings"] == 1
+        assert body["totalArticles"] == 1
+
+        r2 = client.get("/api/analytics/cases/status")
+        assert r2.status_code == 200
+        counts = r2.json()["counts"]
+        assert counts.get("open") == 2
+        assert counts.get("closed") == 1
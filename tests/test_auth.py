@@ -11,9 +11,9 @@ from app.services.auth_service import AuthService
 from app.utils.security import verify_refresh_token
 from app.services.firebase_service import firebase_service
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_user_instance():
-    """Fixture to create a mock User instance."""
+    """Fixture to create a mock User instance, shared read-only across the session."""
     return User(
         uid="mock_uid",
         email="mock@example.com",
@@ -27,18 +27,14 @@ def mock_user_instance():
     )
 
 @pytest.fixture
-def authenticated_client(monkeypatch, mock_user_instance):
+def authenticated_client(as_user, mock_user_instance):
     """
-    Fixture that provides a TestClient with an overridden get_current_user dependency,
-    simulating an authenticated user.
+    Fixture that provides a TestClient with overridden get_current_user and
+    get_optional_user dependencies, simulating an authenticated user.
     """
-    async def mock_get_current_user():
-        return mock_user_instance
-
-    app.dependency_overrides[get_current_user] = mock_get_current_user
-    app.dependency_overrides[get_optional_user] = mock_get_current_user
-    yield TestClient(app)
-    app.dependency_overrides.clear()
+    with as_user(user=mock_user_instance), \
+            as_user(user=mock_user_instance, dependency=get_optional_user):
+        yield TestClient(app)
 
 def test_verify_token_returns_auth_response(monkeypatch, mock_user_instance):
     client = TestClient(app)
@@ -70,16 +66,17 @@ def test_verify_token_returns_auth_response(monkeypatch, mock_user_instance):
     assert "user" in data
     assert "tokens" in data
 
-    # Validate user data
-    assert data["user"]["uid"] == mock_user_instance.uid
-    assert data["user"]["email"] == mock_user_instance.email
-    assert data["user"]["displayName"] == mock_user_instance.display_name
-    assert data["user"]["role"] == mock_user_instance.role
-    assert data["user"]["phoneNumber"] == mock_user_instance.phone_number
-    assert data["user"]["profilePicture"] == mock_user_instance.profile_picture
-    assert data["user"]["emailVerified"] == mock_user_instance.email_verified
-    assert datetime.fromisoformat(data["user"]["createdAt"].replace('Z', '+00:00')) == mock_user_instance.created_at
-    assert datetime.fromisoformat(data["user"]["updatedAt"].replace('Z', '+00:00')) == mock_user_instance.updated_at
+    # Validate user data against the response schema
+    user = UserResponse.model_validate(data["user"])
+    assert user.uid == mock_user_instance.uid
+    assert user.email == mock_user_instance.email
+    assert user.display_name == mock_user_instance.display_name
+    assert user.role == mock_user_instance.role
+    assert user.phone_number == mock_user_instance.phone_number
+    assert user.profile_picture == mock_user_instance.profile_picture
+    assert user.email_verified == mock_user_instance.email_verified
+    assert user.created_at == mock_user_instance.created_at
+    assert user.updated_at == mock_user_instance.updated_at
 
     # Validate tokens data
     assert data["tokens"]["access_token"] == mock_auth_service_return["tokens"]["access_token"]
@@ -91,17 +88,19 @@ def test_verify_token_returns_auth_response(monkeypatch, mock_user_instance):
 def test_refresh_token_returns_new_tokens(monkeypatch, mock_user_instance):
     client = TestClient(app)
 
+    # Copy the shared user so the refresh token doesn't leak into other tests
+    user = mock_user_instance.model_copy(update={"refresh_token": "old_refresh_token"})
+
     # Mock the return value of verify_refresh_token from app.utils.security
-    mock_user_instance.refresh_token = "old_refresh_token"
     monkeypatch.setattr(
         "app.services.auth_service.verify_refresh_token",
-        MagicMock(return_value={"sub": mock_user_instance.uid, "exp": 1234567890})
+        MagicMock(return_value={"sub": user.uid, "exp": 1234567890})
     )
     # Mock auth_service.firebase.get_user_by_uid
     monkeypatch.setattr(
         firebase_service,
         "get_user_by_uid",
-        AsyncMock(return_value=mock_user_instance)
+        AsyncMock(return_value=user)
     )
     # Mock the return value of create_token_pair
     mock_new_tokens = {
@@ -153,14 +152,14 @@ def test_get_current_user_info_returns_user_data(authenticated_client, mock_user
     data = response.json()
 
     # Validate the content of the UserResponse
-    assert data["uid"] == mock_user_instance.uid
-    assert data["email"] == mock_user_instance.email
-    assert data["displayName"] == mock_user_instance.display_name
-    assert data["role"] == mock_user_instance.role
-    assert data["phoneNumber"] == mock_user_instance.phone_number
-    # Note: Pydantic will convert datetime objects to ISO 8601 strings
-    assert datetime.fromisoformat(data["createdAt"].replace('Z', '+00:00')) == mock_user_instance.created_at
-    assert datetime.fromisoformat(data["updatedAt"].replace('Z', '+00:00')) == mock_user_instance.updated_at
+    user = UserResponse.model_validate(data)
+    assert user.uid == mock_user_instance.uid
+    assert user.email == mock_user_instance.email
+    assert user.display_name == mock_user_instance.display_name
+    assert user.role == mock_user_instance.role
+    assert user.phone_number == mock_user_instance.phone_number
+    assert user.created_at == mock_user_instance.created_at
+    assert user.updated_at == mock_user_instance.updated_at
 
 
 def test_register_validation_error_serialization():
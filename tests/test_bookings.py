@@ -1,136 +1,126 @@
-import sys
-from unittest.mock import MagicMock, patch, AsyncMock
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
 from datetime import datetime, timedelta, UTC
 
-# 1. Mock heavy dependencies BEFORE any app imports
-faiss_mock = MagicMock()
-faiss_mock.__spec__ = MagicMock()
-sys.modules["faiss"] = faiss_mock
-st_mock = MagicMock()
-st_mock.__spec__ = MagicMock()
-sys.modules["sentence_transformers"] = st_mock
-
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
 from app.models.user import UserRole
-from app.dependencies import get_current_user
 from app.models.booking import BookingStatus
 
-client = TestClient(app)
-
-@pytest.fixture
-def mock_firebase_service():
-    with patch("app.api.routes.bookings.firebase_service") as mock:
-        yield mock
 
 @pytest.fixture
-def mock_notification_service():
-    with patch("app.api.routes.bookings.notification_service") as mock:
-        yield mock
+def mock_notification_service(monkeypatch):
+    m = SimpleNamespace(send_to_user=AsyncMock())
+    monkeypatch.setattr("app.api.routes.bookings.notification_service", m)
+    return m
 
 # --- Tests ---
 
-def test_list_bookings_rbac_lawyer(mock_firebase_service):
+async def test_list_bookings_rbac_lawyer(aclient, as_user, fake_firebase):
     """Lawyers can list their assigned bookings"""
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "l1", "role": UserRole.LAWYER}
-    
-    # Mock return
-    mock_firebase_service.query_collection = AsyncMock(return_value=([], 0))
-    
-    client.get("/api/bookings")
-    
-    # Verify filters contained lawyerId=l1
-    args = mock_firebase_service.query_collection.call_args
-    assert args.kwargs["filters"]["lawyerId"] == "l1"
-    assert "userId" not in args.kwargs["filters"]
-    
-    app.dependency_overrides = {}
-
-def test_list_bookings_rbac_client(mock_firebase_service):
+    with as_user(UserRole.LAWYER, "l1"):
+        # Mock return
+        fake_firebase.query_collection = AsyncMock(return_value=([], 0))
+
+        await aclient.get("/api/bookings")
+
+        # Verify filters contained lawyerId=l1
+        args = fake_firebase.query_collection.call_args
+        assert args.kwargs["filters"]["lawyerId"] == "l1"
+        assert "userId" not in args.kwargs["filters"]
+
+async def test_list_bookings_rbac_client(aclient, as_user, fake_firebase):
     """Clients can list their own bookings"""
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "u1", "role": UserRole.CITIZEN}
-    
-    mock_firebase_service.query_collection = AsyncMock(return_value=([], 0))
-    
-    client.get("/api/bookings")
-    
-    args = mock_firebase_service.query_collection.call_args
-    assert args.kwargs["filters"]["userId"] == "u1"
-    assert "lawyerId" not in args.kwargs["filters"]
-    
-    app.dependency_overrides = {}
-
-def test_create_booking_future_check(mock_firebase_service):
-    """Booking for past time should fail"""
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "u1", "role": UserRole.CITIZEN}
-    mock_firebase_service.get_document = AsyncMock(return_value={"uid": "l1"}) # Lawyer exists
-    
-    past_date = (datetime.now(UTC) - timedelta(hours=1)).isoformat()
-    
-    payload = {
-        "lawyerId": "l1",
-        "scheduledAt": past_date,
-        "duration": 30
-    }
-    
-    response = client.post("/api/bookings/", json=payload)
-    assert response.status_code == 400
-    assert "at least 15 minutes" in response.json()["detail"]
-    app.dependency_overrides = {}
-
-def test_create_booking_conflict(mock_firebase_service):
+    with as_user(UserRole.CITIZEN, "u1"):
+        fake_firebase.query_collection = AsyncMock(return_value=([], 0))
+
+        await aclient.get("/api/bookings")
+
+        args = fake_firebase.query_collection.call_args
+        assert args.kwargs["filters"]["userId"] == "u1"
+        assert "lawyerId" not in args.kwargs["filters"]
+
+_NOW = datetime.now(UTC)
+_PAST_ISO = (_NOW - timedelta(hours=1)).isoformat()
+_FUTURE_ISO = (_NOW + timedelta(days=2)).isoformat()
+# Tomorrow 10am, and a 10:15 start that overlaps a 30 minute slot at 10:00
+_TOMORROW_10 = _NOW.replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=1)
+_TOMORROW_10_ISO = _TOMORROW_10.isoformat()
+_TOMORROW_10_15_ISO = (_TOMORROW_10 + timedelta(minutes=15)).isoformat()
+
+
+async def _noconflict(*args, **kwargs):
+    """Conflict query that finds no overlapping bookings"""
+    return [], 0
+
+
+@pytest.mark.parametrize(
+    "method,path,payload,existing,expected,detail",
+    [
+        ("get", "/api/bookings/missing", None, None, 404, "not found"),
+        ("put", "/api/bookings/missing/cancel", {}, None, 404, "not found"),
+        ("put", "/api/bookings/b1/cancel", {}, {"userId": "u2", "lawyerId": "l2"}, 403, "Not authorized"),
+        ("post", "/api/bookings/missing/join_call", None, None, 404, "not found"),
+        ("get", "/api/bookings/stats/overview", None, None, 403, "Admin"),
+        # Booking for past time should fail
+        ("post", "/api/bookings/", {"lawyerId": "l1", "scheduledAt": _PAST_ISO, "duration": 30}, {"uid": "l1"}, 400, "at least 15 minutes"),
+        ("post", "/api/bookings/", {"lawyerId": "l1"}, {"uid": "l1"}, 422, None),
+    ],
+)
+async def test_booking_error_paths(aclient, as_user, fake_firebase, method, path, payload, existing, expected, detail):
+    """Negative paths share one table: status code plus a detail substring"""
+    with as_user(UserRole.CITIZEN, "u1"):
+        fake_firebase.get_document = AsyncMock(return_value=existing)
+
+        response = await aclient.request(method.upper(), path, json=payload)
+        assert response.status_code == expected
+        if detail:
+            assert detail in response.json()["detail"]
+
+async def test_create_booking_conflict(aclient, as_user, fake_firebase):
     """Booking overlapping with existing confirmed booking should fail"""
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "u1", "role": UserRole.CITIZEN}
-    mock_firebase_service.get_document = AsyncMock(return_value={"uid": "l1"})
-    mock_firebase_service.set_document = AsyncMock()
-
-    # Existing booking: Now + 1 hour, duration 30 mins
-    base_time = datetime.now(UTC) + timedelta(days=1, hours=10) # Tomorrow 10am
-    
-    existing_booking = {
-        "bookingId": "b1",
-        "lawyerId": "l1",
-        "userId": "u2",
-        "status": "confirmed",
-        "scheduledAt": base_time.isoformat(),
-        "duration": 30,
-        "createdAt": base_time.isoformat(),
-        "updatedAt": base_time.isoformat()
-    }
-    
-    # Return existing booking when querying
-    mock_firebase_service.query_collection = AsyncMock(return_value=([( "b1", existing_booking )], 1))
-
-    # Try to book overlapping slot (Tomorrow 10:15am, duration 30 mins) -> overlaps 10:15-10:30
-    new_start = base_time + timedelta(minutes=15)
-    
-    payload = {
-        "lawyerId": "l1",
-        "scheduledAt": new_start.isoformat(),
-        "duration": 30
-    }
-    
-    response = client.post("/api/bookings/", json=payload)
-    assert response.status_code == 409
-    assert "already booked" in response.json()["detail"]
-    app.dependency_overrides = {}
-
-def test_create_booking_success(mock_firebase_service):
+    with as_user(UserRole.CITIZEN, "u1"):
+        fake_firebase.get_document = AsyncMock(return_value={"uid": "l1"})
+        fake_firebase.set_document = AsyncMock()
+
+        # Existing booking: tomorrow 10am, duration 30 mins
+        existing_booking = {
+            "bookingId": "b1",
+            "lawyerId": "l1",
+            "userId": "u2",
+            "status": "confirmed",
+            "scheduledAt": _TOMORROW_10_ISO,
+            "duration": 30,
+            "createdAt": _TOMORROW_10_ISO,
+            "updatedAt": _TOMORROW_10_ISO
+        }
+
+        # Return existing booking when querying
+        fake_firebase.query_collection = AsyncMock(return_value=([( "b1", existing_booking )], 1))
+
+        # Try to book overlapping slot (Tomorrow 10:15am, duration 30 mins) -> overlaps 10:15-10:30
+        payload = {
+            "lawyerId": "l1",
+            "scheduledAt": _TOMORROW_10_15_ISO,
+            "duration": 30
+        }
+
+        response = await aclient.post("/api/bookings/", json=payload)
+        assert response.status_code == 409
+        assert "already booked" in response.json()["detail"]
+
+async def test_create_booking_success(aclient, as_user, fake_firebase, mock_notification_service):
     """Booking non-overlapping slot should succeed"""
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "u1", "role": UserRole.CITIZEN}
-    mock_firebase_service.get_document = AsyncMock(return_value={"uid": "l1"})
-    mock_firebase_service.set_document = AsyncMock()
-    mock_firebase_service.query_collection = AsyncMock(return_value=([], 0)) # No conflicts
-
-    future_time = (datetime.now(UTC) + timedelta(days=2)).isoformat()
-    
-    payload = {
-        "lawyerId": "l1",
-        "scheduledAt": future_time,
-        "duration": 30
-    }
-    
-    response = client.post("/api/bookings/", json=payload)
-    assert response.status_code == 201
-    app.dependency_overrides = {}
+    with as_user(UserRole.CITIZEN, "u1"):
+        fake_firebase.get_document = AsyncMock(return_value={"uid": "l1"})
+        fake_firebase.set_document = AsyncMock()
+        fake_firebase.query_collection = _noconflict
+
+        payload = {
+            "lawyerId": "l1",
+            "scheduledAt": _FUTURE_ISO,
+            "duration": 30
+        }
+
+        response = await aclient.post("/api/bookings/", json=payload)
+        assert response.status_code == 201
+        mock_notification_service.send_to_user.assert_awaited_once()
@@ -1,139 +1,112 @@
-import sys
-from unittest.mock import MagicMock, patch, AsyncMock
+from unittest.mock import AsyncMock
+from uuid import uuid4
 
-# 1. Mock heavy dependencies BEFORE any app imports
-faiss_mock = MagicMock()
-faiss_mock.__spec__ = MagicMock()
-sys.modules["faiss"] = faiss_mock
-
-st_mock = MagicMock()
-st_mock.__spec__ = MagicMock()
-sys.modules["sentence_transformers"] = st_mock
-
-# 2. Now import pytest and app
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
 from app.models.user import UserRole
-from app.dependencies import get_current_user
-client = TestClient(app)
 
-@pytest.fixture
-def mock_firebase_service():
-    with patch("app.api.routes.cases.firebase_service") as mock:
-        yield mock
 
-@pytest.fixture
-def mock_ingestion_service():
-    with patch("app.api.routes.cases.ingestion_service") as mock:
-        yield mock
+@pytest.fixture(params=["store", "mock"])
+def case_backend(request, fake_firebase):
+    """Serve case documents from the in-memory store or from AsyncMocks.
+
+    Returns a ``seed(case_id, data)`` callable; with no arguments it only
+    installs the backend, for tests that create rather than read cases.
+    """
+    def seed(case_id=None, data=None):
+        if request.param == "mock":
+            fake_firebase.get_document = AsyncMock(return_value=data)
+            fake_firebase.set_document = AsyncMock()
+            fake_firebase.update_document = AsyncMock()
+        elif case_id is not None:
+            fake_firebase.store[f"cases/{case_id}"] = dict(data)
+    return seed
+
+
+_CASE_DEFAULTS = {
+    "userId": "u1",
+    "title": "My Case",
+    "description": "Description must be at least 20 characters long to pass validation.",
+    "status": "submitted",
+    "category": "civil",
+    "createdAt": "2024-01-01T00:00:00+00:00",
+    "updatedAt": "2024-01-01T00:00:00+00:00",
+}
+
 
 @pytest.fixture
-def mock_user_dependency():
-    with patch("app.dependencies.verify_firebase_token") as mock:
-        yield mock
+def make_case(case_backend):
+    """Seed a pre-existing case without going through the create route; returns its id"""
+    def _make(**overrides):
+        case_id = f"case_{uuid4().hex[:8]}"
+        case_backend(case_id, {"caseId": case_id, **_CASE_DEFAULTS, **overrides})
+        return case_id
+    return _make
+
 
 # --- Tests ---
 
-def test_list_cases_rbac_anonymous(mock_firebase_service):
+async def test_list_cases_rbac_anonymous(aclient, as_user, fake_firebase):
     """Anonymous users cannot list cases, but citizens can"""
-    # Override current_user to be None (unauthenticated)
-    app.dependency_overrides[get_current_user] = lambda: None
-    
-    response = client.get("/api/v1/cases")
-    assert response.status_code == 401
-
-    # Override current_user to be Regular User
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "u1", "role": UserRole.CITIZEN, "email": "user@example.com"}
-    mock_firebase_service.query_collection = AsyncMock(return_value=([], 0))
-    
-    response = client.get("/api/v1/cases")
-    assert response.status_code == 200
-
-    # Clean up
-    app.dependency_overrides = {}
-
-@pytest.mark.asyncio
-async def test_list_cases_rbac_lawyer(mock_firebase_service):
+    # Unauthenticated
+    with as_user(None):
+        response = await aclient.get("/api/v1/cases")
+        assert response.status_code == 401
+
+    # Regular user
+    with as_user(UserRole.CITIZEN, "u1", email="user@example.com"):
+        response = await aclient.get("/api/v1/cases")
+        assert response.status_code == 200
+
+async def test_list_cases_rbac_lawyer(aclient, as_user, fake_firebase):
     """Lawyers can list cases"""
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "l1", "role": UserRole.LAWYER}
-    
-    # Mock Firestore query
-    mock_firebase_service.query_collection = AsyncMock(return_value=([], 0))
-    
-    response = client.get("/api/v1/cases")
-    assert response.status_code == 200
-    app.dependency_overrides = {}
-
-def test_get_case_rbac_owner(mock_firebase_service):
+    with as_user(UserRole.LAWYER, "l1"):
+        response = await aclient.get("/api/v1/cases")
+        assert response.status_code == 200
+
+async def test_get_case_rbac_owner(aclient, as_user, make_case):
     """Owner can view their case"""
-    case_data = {
-        "caseId": "c1",
-        "userId": "u1",
-        "title": "My Case",
-        "description": "Description must be at least 20 characters long to pass validation.",
-        "status": "submitted",
-        "category": "civil",
-        "createdAt": "2024-01-01T00:00:00+00:00",
-        "updatedAt": "2024-01-01T00:00:00+00:00"
-    }
-    mock_firebase_service.get_document = AsyncMock(return_value=case_data)
-    mock_firebase_service.update_document = AsyncMock()
-
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "u1", "role": UserRole.CITIZEN}
-    
-    response = client.get("/api/v1/cases/c1")
-    assert response.status_code == 200
-    assert response.json()["title"] == "My Case"
-    app.dependency_overrides = {}
-
-def test_get_case_rbac_forbidden(mock_firebase_service):
+    case_id = make_case(userId="u1")
+
+    with as_user(UserRole.CITIZEN, "u1"):
+        response = await aclient.get(f"/api/v1/cases/{case_id}")
+        assert response.status_code == 200
+        assert response.json()["title"] == "My Case"
+
+async def test_get_case_rbac_forbidden(aclient, as_user, make_case):
     """Non-owner regular user cannot view case"""
-    case_data = {
-        "caseId": "c1",
-        "userId": "u1", # Owned by u1
-        "title": "My Case",
-        "status": "submitted"
-    }
-    mock_firebase_service.get_document = AsyncMock(return_value=case_data)
+    case_id = make_case(userId="u1") # Owned by u1
 
     # Request as u2
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "u2", "role": UserRole.CITIZEN}
-    
-    response = client.get("/api/v1/cases/c1")
-    assert response.status_code == 403
-    app.dependency_overrides = {}
+    with as_user(UserRole.CITIZEN, "u2"):
+        response = await aclient.get(f"/api/v1/cases/{case_id}")
+        assert response.status_code == 403
 
-def test_create_case_anonymous(mock_firebase_service):
+async def test_create_case_anonymous(aclient, as_user, case_backend):
     """Test creating an anonymous case"""
-    app.dependency_overrides[get_current_user] = lambda: None
-    mock_firebase_service.set_document = AsyncMock()
-    
-    payload = {
-        "category": "civil",
-        "title": "Anon Case",
-        "description": "This is a detailed description of the anonymous case.",
-        "isAnonymous": True,
-        "email": "anon@example.com",
-        "contactName": "Anon"
-    }
-    
-    response = client.post("/api/v1/cases/", json=payload)
-    assert response.status_code == 201
-    assert response.json()["isAnonymous"] is True
-    app.dependency_overrides = {}
-
-def test_get_case_stats_admin_only(mock_firebase_service):
+    with as_user(None):
+        case_backend()
+
+        payload = {
+            "category": "civil",
+            "title": "Anon Case",
+            "description": "This is a detailed description of the anonymous case.",
+            "isAnonymous": True,
+            "email": "anon@example.com",
+            "contactName": "Anon"
+        }
+
+        response = await aclient.post("/api/v1/cases/", json=payload)
+        assert response.status_code == 201
+        assert response.json()["isAnonymous"] is True
+
+async def test_get_case_stats_admin_only(aclient, as_user, fake_firebase):
     """Only admin can get stats"""
-    mock_firebase_service.query_collection = AsyncMock(return_value=([], 0))
-    
     # As lawyer (should fail)
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "l1", "role": UserRole.LAWYER}
-    response = client.get("/api/v1/cases/stats/overview")
-    assert response.status_code == 403
-    
+    with as_user(UserRole.LAWYER, "l1"):
+        response = await aclient.get("/api/v1/cases/stats/overview")
+        assert response.status_code == 403
+
     # As Admin
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "a1", "role": UserRole.ADMIN, "is_admin": True}
-    response = client.get("/api/v1/cases/stats/overview")
-    assert response.status_code == 200
-    app.dependency_overrides = {}
+    with as_user(UserRole.ADMIN, "a1", is_admin=True):
+        response = await aclient.get("/api/v1/cases/stats/overview")
+        assert response.status_code == 200
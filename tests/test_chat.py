@@ -1,42 +1,33 @@
-from fastapi.testclient import TestClient
 import pytest
 
-from app.main import app
+from app.services.rag_service import rag_service
 
 
 @pytest.fixture(autouse=True)
-def patch_verify_and_langchain(monkeypatch):
-    def fake_verify(token):
-        if token == "faketoken":
-            return {"uid": "testuid", "email": "test@example.com", "name": "Test User"}
-        return None
-
+def patch_auth_and_langchain(monkeypatch, as_user):
     async def fake_rag_response(session_id, user_id, user_message, **kwargs):
         return f"echo: {user_message}", []
 
     async def fake_create_session(user_id, session_id):
         pass  # do nothing for test
 
-    monkeypatch.setattr("app.services.auth_service.verify_id_token", fake_verify)
-    from app.services.rag_service import rag_service
     monkeypatch.setattr(
         rag_service, "generate_rag_response", fake_rag_response
     )
     monkeypatch.setattr(
         "app.services.langchain_service.create_session", fake_create_session
     )
+    with as_user("user", "testuid", email="test@example.com", name="Test User"):
+        yield
 
 
-def test_create_session_and_send_message(patch_verify_and_langchain):
-    client = TestClient(app)
-    headers = {"Authorization": "Bearer faketoken"}
-    r = client.post("/api/chat/sessions", headers=headers)
+async def test_create_session_and_send_message(aclient, patch_auth_and_langchain):
+    r = await aclient.post("/api/chat/sessions")
     assert r.status_code == 200
     sid = r.json()["sessionId"]
 
-    r2 = client.post(
+    r2 = await aclient.post(
         f"/api/chat/sessions/{sid}/messages",
-        headers=headers,
         json={"message": "Hello AI"},
     )
     assert r2.status_code == 200
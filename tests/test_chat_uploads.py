@@ -1,139 +1,124 @@
-import sys
-from unittest.mock import MagicMock, patch, AsyncMock
-from datetime import datetime
-
-# Mock heavy dependencies BEFORE imports
-faiss_mock = MagicMock()
-faiss_mock.__spec__ = MagicMock()
-sys.modules["faiss"] = faiss_mock
-st_mock = MagicMock()
-st_mock.__spec__ = MagicMock()
-sys.modules["sentence_transformers"] = st_mock
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
 
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
-from app.dependencies import get_current_user
 
-client = TestClient(app)
+
+class _StubPath:
+    """Minimal stand-in for the Path returned by file_service.get_file_path.
+
+    It is path-like, so mimetypes.guess_type resolves the real type from the suffix.
+    """
+    path = ""
+    content = b""
+
+    def __fspath__(self):
+        return self.path
+
+    def __str__(self):
+        return self.path
+
+    def read_bytes(self):
+        return self.content
+
+
+class _StubImagePath(_StubPath):
+    path = "/tmp/fake.jpg"
+    content = b"fakeimagebytes"
+
+
+class _StubPdfPath(_StubPath):
+    path = "/tmp/fake.pdf"
+
+
+# kind -> (stub path, attachment id, image mime types sent to Gemini, extracted PDF text)
+_ATTACHMENT_CASES = {
+    "image": (_StubImagePath, "file-123.jpg", ["image/jpeg"], None),
+    "pdf": (_StubPdfPath, "contract.pdf", [], "PDF CONTENT HERE"),
+}
+
 
 @pytest.fixture
-def mock_gemini_service():
-    with patch("app.services.langchain_service.ai_service") as mock:
-        yield mock
+def mock_gemini_service(monkeypatch):
+    m = SimpleNamespace(send_message=AsyncMock(return_value={"response": ""}))
+    monkeypatch.setattr("app.services.langchain_service.ai_service", m)
+    return m
 
 @pytest.fixture
-def mock_firebase_service():
-    with patch("app.services.langchain_service.firebase_service") as mock:
-        # Important: Mock get_chat_history to return empty list
-        mock.get_chat_history = AsyncMock(return_value=[])
-        mock.add_chat_message = AsyncMock()
-        mock.create_chat_session = AsyncMock()
-        mock.get_user_chat_sessions = AsyncMock(return_value=[])
-        mock.get_chat_session = AsyncMock(return_value={"userId": "u1"})
-        yield mock
+def mock_firebase_service(monkeypatch):
+    # Important: get_chat_history must return an empty list
+    m = SimpleNamespace(
+        get_chat_history=AsyncMock(return_value=[]),
+        add_chat_message=AsyncMock(),
+        create_chat_session=AsyncMock(),
+        get_user_chat_sessions=AsyncMock(return_value=[]),
+        get_chat_session=AsyncMock(return_value={"userId": "u1"}),
+    )
+    monkeypatch.setattr("app.services.langchain_service.firebase_service", m)
+    return m
 
 @pytest.fixture
-def mock_file_service():
-    with patch("app.api.routes.chat.file_service.file_service") as mock:
-        yield mock
+def mock_file_service(monkeypatch):
+    m = SimpleNamespace(save_upload=AsyncMock())
+    monkeypatch.setattr("app.api.routes.chat.file_service.file_service", m)
+    return m
 
 @pytest.fixture
-def mock_file_service_internal():
-    # Mock the one used inside langchain_service
-    with patch("app.services.langchain_service.file_service.file_service") as mock:
-        yield mock
+def mock_file_service_internal(monkeypatch):
+    # The instance used inside langchain_service
+    m = SimpleNamespace(get_file_path=lambda file_id: None)
+    monkeypatch.setattr("app.services.langchain_service.file_service.file_service", m)
+    return m
+
+@pytest.fixture(params=list(_ATTACHMENT_CASES))
+def attachment(request, monkeypatch, mock_file_service_internal):
+    stub, file_id, mime_types, pdf_text = _ATTACHMENT_CASES[request.param]
+    mock_file_service_internal.get_file_path = lambda fid: stub()
+    if pdf_text is not None:
+        monkeypatch.setattr(
+            "app.services.langchain_service.extract_text_from_pdf", lambda path: pdf_text
+        )
+    return SimpleNamespace(file_id=file_id, mime_types=mime_types, pdf_text=pdf_text)
 
 # --- Tests ---
 
-def test_upload_file_route(mock_file_service):
+async def test_upload_file_route(aclient, as_user, mock_file_service):
     """Test POST /api/chat/upload"""
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "u1", "role": "user"}
-    
-    mock_file_service.save_upload = AsyncMock(return_value="file-123.jpg")
-    
-    files = {"file": ("test.jpg", b"fakecontent", "image/jpeg")}
-    response = client.post("/api/chat/upload", files=files)
-    
-    assert response.status_code == 200
-    assert response.json()["fileId"] == "file-123.jpg"
-    
-    app.dependency_overrides = {}
-
-def test_chat_message_with_image_attachment(
-    mock_gemini_service, 
+    with as_user("user", "u1"):
+        mock_file_service.save_upload = AsyncMock(return_value="file-123.jpg")
+
+        files = {"file": ("test.jpg", b"fakecontent", "image/jpeg")}
+        response = await aclient.post("/api/chat/upload", files=files)
+
+        assert response.status_code == 200
+        assert response.json()["fileId"] == "file-123.jpg"
+
+async def test_chat_message_with_attachment(
+    aclient,
+    as_user,
+    mock_gemini_service,
     mock_firebase_service,
-    mock_file_service_internal
+    attachment
 ):
-    """Test sending message with image attachment triggers multimodal Gemini call"""
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "u1", "role": "user"}
-    
-    # Setup Mocks
-    mock_file_service_internal.get_file_path = MagicMock()
-    # Create a mock path object that behaves like Path
-    path_mock = MagicMock()
-    path_mock.read_bytes.return_value = b"fakeimagebytes"
-    mock_file_service_internal.get_file_path.return_value = path_mock
-    
-    # Helper to mock mimetypes.guess_type
-    with patch("mimetypes.guess_type", return_value=("image/jpeg", None)):
-        
-        mock_gemini_service.send_message = AsyncMock(return_value={"response": "I see the image"})
-        
+    """Images go to Gemini as inline data; PDF text is appended to the prompt"""
+    with as_user("user", "u1"):
+        mock_gemini_service.send_message = AsyncMock(return_value={"response": "Done"})
+
         payload = {
-            "message": "What is this?",
+            "message": "Describe this",
             "sessionId": "sess1",
-            "attachments": ["file-123.jpg"]
+            "attachments": [attachment.file_id]
         }
-        
-        response = client.post("/api/chat/message", json=payload)
-        
-        assert response.status_code == 200
-        assert response.json()["reply"] == "I see the image"
-        
-        # Verify gemini was called with images
-        call_args = mock_gemini_service.send_message.call_args
-        # send_message(prompt, images=[...])
-        assert call_args is not None
-        _, kwargs = call_args
-        assert "images" in kwargs
-        assert len(kwargs["images"]) == 1
-        assert kwargs["images"][0]["mime_type"] == "image/jpeg"
 
-    app.dependency_overrides = {}
+        response = await aclient.post("/api/chat/message", json=payload)
 
-def test_chat_message_with_pdf_attachment(
-    mock_gemini_service,
-    mock_firebase_service,
-    mock_file_service_internal
-):
-    """Test sending message with PDF extracts text and appends to prompt"""
-    app.dependency_overrides[get_current_user] = lambda: {"uid": "u1", "role": "user"}
-
-    # Setup Mocks
-    path_mock = MagicMock()
-    path_mock.__str__.return_value = "/tmp/fake.pdf"
-    mock_file_service_internal.get_file_path.return_value = path_mock
-    
-    # Mock text extraction
-    with patch("app.services.langchain_service.extract_text_from_pdf", return_value="PDF CONTENT HERE") as mock_extract:
-        with patch("mimetypes.guess_type", return_value=("application/pdf", None)):
-            
-            mock_gemini_service.send_message = AsyncMock(return_value={"response": "Analyzed PDF"})
-            
-            payload = {
-                "message": "Analyze this",
-                "sessionId": "sess1",
-                "attachments": ["contract.pdf"]
-            }
-            
-            response = client.post("/api/chat/message", json=payload)
-            
-            assert response.status_code == 200
-            
-            # Verify Prompt contains extracted text
-            call_args = mock_gemini_service.send_message.call_args
-            prompt_arg = call_args[0][0]
-            assert "PDF CONTENT HERE" in prompt_arg
-            
-    app.dependency_overrides = {}
+        assert response.status_code == 200
+        assert response.json()["reply"] == "Done"
+
+        # send_message(prompt, images=[...])
+        args, kwargs = mock_gemini_service.send_message.call_args
+        assert [img["mime_type"] for img in kwargs["images"]] == attachment.mime_types
+        if attachment.pdf_text is not None:
+            assert f"[Attached PDF Content]:\n{attachment.pdf_text}" in args[0]
+        else:
+            assert "[Attached PDF Content]" not in args[0]
@@ -1,38 +1,30 @@
-import sys
-from unittest.mock import MagicMock
-faiss_mock = MagicMock()
-faiss_mock.__spec__ = MagicMock()
-sys.modules["faiss"] = faiss_mock
-st_mock = MagicMock()
-st_mock.__spec__ = MagicMock()
-sys.modules["sentence_transformers"] = st_mock
+import pytest
 
-from fastapi.testclient import TestClient
-from app.main import app
-from app.services import firebase_service
-from app.dependencies import get_current_user
 from app.models.user import UserRole, User
 
+# Built once; the overrides below hand out the same instances on every request
+_LAWYER_USER = User(
+    uid="lawyer_stats_test",
+    email="lawyer@test.com",
+    display_name="Test Lawyer",
+    role=UserRole.LAWYER
+)
+_ORG_USER = User(
+    uid="org_stats_test",
+    email="org@test.com",
+    display_name="Test Org",
+    role=UserRole.ORGANIZATION
+)
+_CITIZEN_USER = User(
+    uid="just_user",
+    email="user@test.com",
+    display_name="Test User",
+    role=UserRole.CITIZEN
+)
 
-def test_lawyer_dashboard_stats(monkeypatch):
-    store = {}
-    
-    # Mock firebase methods
-    async def get_doc(path):
-        return store.get(path)
 
-    async def query_docs(collection, filters=None, limit=20, offset=0):
-        # Very simple mock matching
-        res = []
-        if collection == "cases":
-             # Should match lawyerId == lawyer_stats_test
-             res = [("c1", {})] 
-        elif collection == "bookings":
-             res = [("b1", {}), ("b2", {})]
-        return res, len(res)
-
-    monkeypatch.setattr(firebase_service, "get_document", get_doc, raising=False)
-    monkeypatch.setattr(firebase_service, "query_collection", query_docs, raising=False)
+def test_lawyer_dashboard_stats(client, as_user, fake_firebase):
+    store = fake_firebase.store
 
     # Setup Lawyer Profile
     store["lawyers/lawyer_stats_test"] = {
@@ -40,75 +32,44 @@ def test_lawyer_dashboard_stats(monkeypatch):
         "numReviews": 10,
         "views": 100
     }
+    # One active case and two bookings for this lawyer, plus unrelated noise
+    store["cases/c1"] = {"lawyerId": "lawyer_stats_test", "status": "active"}
+    store["cases/c2"] = {"lawyerId": "lawyer_stats_test", "status": "closed"}
+    store["cases/c3"] = {"lawyerId": "someone_else", "status": "active"}
+    store["bookings/b1"] = {"lawyerId": "lawyer_stats_test"}
+    store["bookings/b2"] = {"lawyerId": "lawyer_stats_test"}
 
     # Mock Auth as Lawyer
-    app.dependency_overrides[get_current_user] = lambda: User(
-        uid="lawyer_stats_test",
-        email="lawyer@test.com",
-        display_name="Test Lawyer",
-        role=UserRole.LAWYER
-    )
-    
-    client = TestClient(app)
-    r = client.get("/api/analytics/lawyer")
-    
-    assert r.status_code == 200
-    data = r.json()
-    assert data["total_views"] == 100
-    assert data["active_cases"] == 1
-    assert data["total_bookings"] == 2
-    assert data["raw_rating"] == 4.5
-    
-    app.dependency_overrides.clear()
+    with as_user(user=_LAWYER_USER):
+        r = client.get("/api/analytics/lawyer")
+
+        assert r.status_code == 200
+        data = r.json()
+        assert data["total_views"] == 100
+        assert data["active_cases"] == 1
+        assert data["total_bookings"] == 2
+        assert data["raw_rating"] == 4.5
 
 
-def test_organization_dashboard_stats(monkeypatch):
-    store = {}
-    
-    async def get_doc(path):
-        return store.get(path)
-        
-    monkeypatch.setattr(firebase_service, "get_document", get_doc, raising=False)
-    
+def test_organization_dashboard_stats(client, as_user, fake_firebase):
     # Setup Org Profile
-    store["organizations/org_stats_test"] = {
+    fake_firebase.store["organizations/org_stats_test"] = {
         "verified": True,
         "views": 50
     }
 
     # Mock Auth as Organization
-    app.dependency_overrides[get_current_user] = lambda: User(
-        uid="org_stats_test",
-        email="org@test.com",
-        display_name="Test Org",
-        role=UserRole.ORGANIZATION
-    )
+    with as_user(user=_ORG_USER):
+        r = client.get("/api/analytics/organization")
 
-    client = TestClient(app)
-    r = client.get("/api/analytics/organization")
-    
-    assert r.status_code == 200
-    data = r.json()
-    assert data["total_views"] == 50
-    assert data["verified"] is True
-    
-    app.dependency_overrides.clear()
+        assert r.status_code == 200
+        data = r.json()
+        assert data["total_views"] == 50
+        assert data["verified"] is True
 
 
-def test_wrong_role_access(monkeypatch):
-    # Mock Auth as User (accessing lawyer stats)
-    app.dependency_overrides[get_current_user] = lambda: User(
-        uid="just_user",
-        email="user@test.com",
-        display_name="Test User",
-        role=UserRole.CITIZEN
-    )
-    
-    client = TestClient(app)
-    r = client.get("/api/analytics/lawyer")
-    assert r.status_code == 403 # Forbidden
-    
-    r = client.get("/api/analytics/organization")
-    assert r.status_code == 403 # Forbidden
-    
-    app.dependency_overrides.clear()
+@pytest.mark.parametrize("path", ["/api/analytics/lawyer", "/api/analytics/organization"])
+def test_wrong_role_access(client, as_user, path):
+    # Mock Auth as User (accessing lawyer/organization stats)
+    with as_user(user=_CITIZEN_USER):
+        assert client.get(path).status_code == 403 # Forbidden
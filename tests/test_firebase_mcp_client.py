@@ -1,14 +1,26 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock
-from app.services.firebase_service import FirebaseService
+from unittest.mock import AsyncMock
 from app.services.firebase_mcp_client import FirebaseMcpClient
 from app.models.user import User
 
 
+class _FakeFirebaseService:
+    """Only the FirebaseService methods these tests exercise.
+
+    Cheaper than ``AsyncMock(spec=FirebaseService)``, which introspects the
+    whole service class on every construction.
+    """
+
+    def __init__(self):
+        self.get_user_by_uid = AsyncMock()
+        self.create_user = AsyncMock()
+        self.upload_file = AsyncMock()
+
+
 @pytest.fixture
 def mock_firebase_service():
-    """Fixture to provide a mocked FirebaseService instance."""
-    return AsyncMock(spec=FirebaseService)
+    """Fixture to provide a fake FirebaseService instance."""
+    return _FakeFirebaseService()
 
 
 @pytest.fixture
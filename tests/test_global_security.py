@@ -1,110 +1,72 @@
-import sys
-from unittest.mock import MagicMock, patch, AsyncMock
+from unittest.mock import AsyncMock
 from datetime import datetime
 
-# Mock heavy dependencies
-faiss_mock = MagicMock()
-faiss_mock.__spec__ = MagicMock()
-sys.modules["faiss"] = faiss_mock
-st_mock = MagicMock()
-st_mock.__spec__ = MagicMock()
-sys.modules["sentence_transformers"] = st_mock
-
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
 from app.dependencies import get_current_user, get_optional_user
 from app.models.user import User, UserRole
 
-client = TestClient(app)
-
 @pytest.fixture
-def mock_firebase_service():
-    with patch("app.api.routes.users.firebase_service") as mock:
-        yield mock
+def mock_firebase_service(module_patch):
+    return module_patch("app.api.routes.users.firebase_service")
 
-# --- Tests ---
+_T0 = datetime(2024, 1, 1)
 
-def test_get_user_profile_me_privacy(mock_firebase_service):
-    """My profile should have email (Private)"""
-    mock_user = User(
-        uid="me123",
-        email="me@example.com",
-        display_name="Me",
-        role=UserRole.CITIZEN,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
-    )
-    # We call /api/users/profile which returns 'current_user' directly
-    # dependency mock
-    app.dependency_overrides[get_current_user] = lambda: {
-        "uid": "me123", 
-        "email": "me@example.com", 
-        "role": "user",
-        "created_at": datetime.now(),
-        "updated_at": datetime.now()
-    }
-    
-    response = client.get("/api/users/profile")
-    assert response.status_code == 200
-    data = response.json()
-    assert "email" in data
-    assert data["email"] == "me@example.com"
-    
-    app.dependency_overrides = {}
+# Override payloads
+_ME = {
+    "uid": "me123",
+    "email": "me@example.com",
+    "display_name": "Me",
+    "role": "user",
+    "created_at": _T0,
+    "updated_at": _T0
+}
+_ME_MINIMAL = {"uid": "me123", "role": "user"}
+
+# Stored users returned by get_user_by_uid
+_ME_USER = User(
+    uid="me123",
+    email="me@example.com",
+    display_name="Me",
+    role=UserRole.CITIZEN,
+    created_at=_T0,
+    updated_at=_T0
+)
+_OTHER_USER = User(
+    uid="other123",
+    email="other@example.com",
+    display_name="Other",
+    role=UserRole.CITIZEN,
+    created_at=_T0,
+    updated_at=_T0
+)
+
+# --- Tests ---
 
-def test_get_user_by_id_public(mock_firebase_service):
-    """Other user profile should NOT have email (Public)"""
-    mock_user = User(
-        uid="other123",
-        email="other@example.com",
-        display_name="Other",
-        role=UserRole.CITIZEN,
-        created_at=datetime.utcnow(), 
-        updated_at=datetime.utcnow()
-    )
-    mock_firebase_service.get_user_by_uid = AsyncMock(return_value=mock_user)
-    
-    # As anonymous user (or different user)
-    app.dependency_overrides[get_optional_user] = lambda: None
-    
-    response = client.get("/api/users/profile/other123")
-    
-    assert response.status_code == 200
-    data = response.json()
-    
-    # Verify Public Schema fields
-    assert data["uid"] == "other123"
-    assert data["displayName"] == "Other"
-    
-    # Verify Private fields are missing
-    assert "email" not in data
-    assert "phone_number" not in data
-    
-    app.dependency_overrides = {}
+@pytest.mark.parametrize(
+    "path, dependency, override, stored, uid, display_name, email",
+    [
+        # /api/users/profile returns 'current_user' directly: mine, so private
+        ("/api/users/profile", get_current_user, _ME, None, "me123", "Me", "me@example.com"),
+        # Anonymous viewer of another user's profile gets the public schema
+        ("/api/users/profile/other123", get_optional_user, None, _OTHER_USER, "other123", "Other", None),
+        # Owner viewing their own ID sees the private schema
+        ("/api/users/profile/me123", get_optional_user, _ME_MINIMAL, _ME_USER, "me123", "Me", "me@example.com"),
+    ],
+    ids=["me", "by_id_public", "by_id_owner"],
+)
+def test_get_user_privacy(
+    client, as_user, mock_firebase_service, path, dependency, override, stored, uid, display_name, email
+):
+    """Email is only exposed to the profile's owner; ``email=None`` means it must be absent"""
+    mock_firebase_service.get_user_by_uid = AsyncMock(return_value=stored)
+    with as_user(user=override, dependency=dependency):
+        response = client.get(path)
 
-def test_get_user_by_id_owner(mock_firebase_service):
-    """Owner viewing their own ID should see email (Private)"""
-    mock_user = User(
-        uid="me123",
-        email="me@example.com",
-        display_name="Me",
-        role=UserRole.CITIZEN,
-        created_at=datetime.utcnow(), 
-        updated_at=datetime.utcnow()
-    )
-    mock_firebase_service.get_user_by_uid = AsyncMock(return_value=mock_user)
-    
-    # Logged in as me123
-    app.dependency_overrides[get_optional_user] = lambda: {"uid": "me123", "role": "user"}
-    
-    response = client.get("/api/users/profile/me123")
-    
-    assert response.status_code == 200
-    data = response.json()
-    
-    # Verify Private Schema fields are present
-    assert "email" in data
-    assert data["email"] == "me@example.com"
-    
-    app.dependency_overrides = {}
+        assert response.status_code == 200
+        data = response.json()
+        assert data["uid"] == uid
+        assert data["displayName"] == display_name
+        assert data.get("email") == email
+        # Private-only fields appear exactly when the email does
+        assert ("email" in data) == (email is not None)
+        assert ("phoneNumber" in data) == (email is not None)
@@ -112,13 +112,10 @@ def mock_firebase_service():
         yield mock_service
 
 @pytest.fixture(autouse=True)
-def mock_require_lawyer():
+def mock_require_lawyer(as_user):
     """Mocks the require_lawyer dependency to return our mock lawyer user."""
-    async def override_dep():
-        return mock_lawyer_user
-    app.dependency_overrides[require_lawyer] = override_dep
-    yield override_dep
-    app.dependency_overrides.clear()
+    with as_user(user=mock_lawyer_user, dependency=require_lawyer):
+        yield mock_lawyer_user
 
 
 @pytest.mark.asyncio
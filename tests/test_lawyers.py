@@ -1,93 +1,49 @@
-from fastapi.testclient import TestClient
-from app.main import app
+import pytest
 
-from app.services import firebase_service
-from app.dependencies import get_current_user
 
-
-def test_list_lawyers_mocked(monkeypatch):
-    store = {}
-
-    async def query_docs(collection, filters=None, limit=20, offset=0):
-        docs = []
-        for path, data in store.items():
-            if path.startswith(f"{collection}/"):
-                docs.append((path.split("/")[-1], data))
-        return docs, len(docs)
-
-    monkeypatch.setattr(firebase_service, "query_collection", query_docs, raising=False)
-
-    # put two lawyers
-    store["lawyers/lawyer_1"] = {
+async def test_list_lawyers_mocked(aclient, fake_firebase):
+    # put two lawyers; the public listing only returns verified profiles
+    fake_firebase.store["lawyers/lawyer_1"] = {
         "displayName": "Alice",
         "practiceAreas": ["family"],
         "hourlyRate": 60,
+        "verified": True,
     }
-    store["lawyers/lawyer_2"] = {
+    fake_firebase.store["lawyers/lawyer_2"] = {
         "displayName": "Bob",
         "practiceAreas": ["employment"],
         "hourlyRate": 80,
+        "verified": True,
     }
 
-    client = TestClient(app)
-    r = client.get("/api/lawyers")
+    r = await aclient.get("/api/lawyers")
     assert r.status_code == 200
     data = r.json()
     assert data["total"] == 2
     assert len(data["lawyers"]) == 2
 
 
-def test_get_lawyer_mocked(monkeypatch):
-    store = {"lawyers/lawyer_123": {"displayName": "Jane", "licenseNumber": "BAR-123"}}
-
-    async def get_doc(path):
-        return store.get(path)
+async def test_get_lawyer_mocked(aclient, fake_firebase):
+    fake_firebase.store["lawyers/lawyer_123"] = {"displayName": "Jane", "licenseNumber": "BAR-123"}
 
-    monkeypatch.setattr(firebase_service, "get_document", get_doc, raising=False)
-
-    client = TestClient(app)
-    r = client.get("/api/lawyers/lawyer_123")
+    r = await aclient.get("/api/lawyers/lawyer_123")
     assert r.status_code == 200
     data = r.json()
     assert data["uid"] == "lawyer_123"
     assert data["display_name"] in ("Jane", "Jane")
 
 
-def test_create_update_delete_lawyer(monkeypatch):
-    store = {}
-
-    async def set_doc(path, data):
-        store[path] = data
-
-    async def get_doc(path):
-        return store.get(path)
-
-    async def update_doc(path, data):
-        if path in store:
-            store[path].update(data)
-        else:
-            store[path] = data
-
-    async def delete_doc(path):
-        if path in store:
-            del store[path]
-
-    monkeypatch.setattr(firebase_service, "set_document", set_doc, raising=False)
-    monkeypatch.setattr(firebase_service, "get_document", get_doc, raising=False)
-    monkeypatch.setattr(firebase_service, "update_document", update_doc, raising=False)
-    monkeypatch.setattr(firebase_service, "delete_document", delete_doc, raising=False)
-
-    # override auth
-    from app.dependencies import get_current_user
-
-    app.dependency_overrides[get_current_user] = lambda: {
-        "uid": "lawyer_new",
-        "is_admin": False,
+@pytest.fixture
+def owner_profile():
+    return "lawyers", "lawyer", "lawyer_new", {
+        "displayName": "New Lawyer",
+        "email": "new@law.com",
+        "practiceAreas": ["family"],
     }
-    client = TestClient(app)
 
-    # Create
-    r = client.post(
+
+async def test_create_lawyer(aclient, fake_firebase, as_owner):
+    r = await aclient.post(
         "/api/lawyers",
         json={
             "display_name": "New Lawyer",
@@ -98,15 +54,16 @@ def test_create_update_delete_lawyer(monkeypatch):
     assert r.status_code == 200
     data = r.json()
     assert data["uid"] == "lawyer_new"
+    assert "lawyers/lawyer_new" in fake_firebase.store
+
 
-    # Update
-    r2 = client.put("/api/lawyers/lawyer_new", json={"bio": "Experienced"})
-    assert r2.status_code == 200
-    assert store.get("lawyers/lawyer_new").get("bio") == "Experienced"
+async def test_update_lawyer(aclient, fake_firebase, as_owner, existing_profile):
+    r = await aclient.put(f"/api/lawyers/{existing_profile}", json={"bio": "Experienced"})
+    assert r.status_code == 200
+    assert fake_firebase.store.get("lawyers/lawyer_new").get("bio") == "Experienced"
 
-    # Delete
-    r3 = client.delete("/api/lawyers/lawyer_new")
-    assert r3.status_code == 200
-    assert "lawyers/lawyer_new" not in store
 
-    app.dependency_overrides.clear()
+async def test_delete_lawyer(aclient, fake_firebase, as_owner, existing_profile):
+    r = await aclient.delete(f"/api/lawyers/{existing_profile}")
+    assert r.status_code == 200
+    assert "lawyers/lawyer_new" not in fake_firebase.store
@@ -1,46 +1,19 @@
-import sys
-from unittest.mock import MagicMock
-faiss_mock = MagicMock()
-faiss_mock.__spec__ = MagicMock()
-sys.modules["faiss"] = faiss_mock
-
-st_mock = MagicMock()
-st_mock.__spec__ = MagicMock()
-sys.modules["sentence_transformers"] = st_mock
-
-from fastapi.testclient import TestClient
-from app.main import app
-from app.services import firebase_service
-from app.dependencies import get_current_user
-
-def test_list_organizations_mocked(monkeypatch):
-    store = {}
-
-    async def query_docs(collection, filters=None, limit=20, offset=0):
-        docs = []
-        for path, data in store.items():
-            if path.startswith(f"{collection}/"):
-                # Filter mock if needed, but for simple list likely not needed for this test
-                # unless we want to test filtering specifically
-                docs.append((path.split("/")[-1], data))
-        return docs, len(docs)
-
-    monkeypatch.setattr(firebase_service, "query_collection", query_docs, raising=False)
+import pytest
 
+async def test_list_organizations_mocked(aclient, fake_firebase):
     # put two organizations
-    store["organizations/org_1"] = {
+    fake_firebase.store["organizations/org_1"] = {
         "displayName": "NGO A",
         "organizationType": "NGO",
         "location": "City X"
     }
-    store["organizations/org_2"] = {
+    fake_firebase.store["organizations/org_2"] = {
         "displayName": "Firm B",
         "organizationType": "Law Firm",
         "location": "City Y"
     }
 
-    client = TestClient(app)
-    r = client.get("/api/organizations")
+    r = await aclient.get("/api/organizations")
     assert r.status_code == 200
     data = r.json()
     assert data["total"] == 2
@@ -48,39 +21,17 @@ def test_list_organizations_mocked(monkeypatch):
     assert data["organizations"][0]["displayName"] == "NGO A"
 
 
-def test_create_update_delete_organization(monkeypatch):
-    store = {}
-
-    async def set_doc(path, data):
-        store[path] = data
-
-    async def get_doc(path):
-        return store.get(path)
-
-    async def update_doc(path, data):
-        if path in store:
-            store[path].update(data)
-        else:
-            store[path] = data
-
-    async def delete_doc(path):
-        if path in store:
-            del store[path]
-
-    monkeypatch.setattr(firebase_service, "set_document", set_doc, raising=False)
-    monkeypatch.setattr(firebase_service, "get_document", get_doc, raising=False)
-    monkeypatch.setattr(firebase_service, "update_document", update_doc, raising=False)
-    monkeypatch.setattr(firebase_service, "delete_document", delete_doc, raising=False)
-
-    # override auth
-    app.dependency_overrides[get_current_user] = lambda: {
-        "uid": "org_new",
-        "is_admin": False,
+@pytest.fixture
+def owner_profile():
+    return "organizations", "organization", "org_new", {
+        "displayName": "New Org",
+        "email": "new@org.com",
+        "organizationType": "NGO",
     }
-    client = TestClient(app)
 
-    # Create
-    r = client.post(
+
+async def test_create_organization(aclient, fake_firebase, as_owner):
+    r = await aclient.post(
         "/api/organizations",
         json={
             "display_name": "New Org",
@@ -92,15 +43,16 @@ def test_create_update_delete_organization(monkeypatch):
     data = r.json()
     assert data["uid"] == "org_new"
     assert data["displayName"] == "New Org"
+    assert "organizations/org_new" in fake_firebase.store
+
 
-    # Update
-    r2 = client.put("/api/organizations/org_new", json={"bio": "We help people"})
-    assert r2.status_code == 200
-    assert store.get("organizations/org_new").get("bio") == "We help people"
+async def test_update_organization(aclient, fake_firebase, as_owner, existing_profile):
+    r = await aclient.put(f"/api/organizations/{existing_profile}", json={"bio": "We help people"})
+    assert r.status_code == 200
+    assert fake_firebase.store.get("organizations/org_new").get("bio") == "We help people"
 
-    # Delete
-    r3 = client.delete("/api/organizations/org_new")
-    assert r3.status_code == 200
-    assert "organizations/org_new" not in store
 
-    app.dependency_overrides.clear()
+async def test_delete_organization(aclient, fake_firebase, as_owner, existing_profile):
+    r = await aclient.delete(f"/api/organizations/{existing_profile}")
+    assert r.status_code == 200
+    assert "organizations/org_new" not in fake_firebase.store
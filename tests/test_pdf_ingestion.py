@@ -1,29 +1,23 @@
-import sys
-from unittest.mock import MagicMock, AsyncMock, patch
-
-# Mock faiss and other dependencies BEFORE importing app/services
-faiss_mock = MagicMock()
-faiss_mock.__spec__ = MagicMock()
-sys.modules["faiss"] = faiss_mock
-st_mock = MagicMock()
-st_mock.__spec__ = MagicMock()
-sys.modules["sentence_transformers"] = st_mock
-
-# Now import the service to test
+from unittest.mock import AsyncMock, MagicMock, mock_open, patch
+
 from app.services import pdf_ingestion_service
 from app.services.rag_service import rag_service
 
 import pytest
-from pathlib import Path
-
-@pytest.mark.asyncio
-async def test_load_pdfs_from_folder_success(tmp_path):
-    # Create a dummy PDF file
-    pdf_dir = tmp_path / "pdfs"
-    pdf_dir.mkdir()
-    pdf_file = pdf_dir / "test.pdf"
-    pdf_file.write_bytes(b"%PDF-1.4 dummy content")
-    
+
+_N_PDFS = 12
+
+
+@pytest.fixture(scope="session")
+def pdf_dir(tmp_path_factory):
+    """A folder of dummy PDF files, written once; the tests only read it."""
+    pdf_dir = tmp_path_factory.mktemp("pdfs")
+    for i in range(_N_PDFS):
+        (pdf_dir / f"test_{i}.pdf").write_bytes(b"%PDF-1.4 dummy content")
+    return pdf_dir
+
+
+async def test_load_pdfs_from_folder_success(pdf_dir):
     # Mock PDFProcessor
     with patch("app.services.pdf_ingestion_service.PDFProcessor") as MockPDFProcessor:
         mock_processor = MockPDFProcessor.return_value
@@ -32,41 +26,85 @@ async def test_load_pdfs_from_folder_success(tmp_path):
         
         # Mock rag_service.add_documents
         with patch.object(rag_service, "add_documents", new_callable=AsyncMock) as mock_add:
-            mock_add.return_value = {"added": 1, "skipped": 0}
+            mock_add.return_value = {"added": _N_PDFS, "skipped": 0}
             
             # Run the service
             stats = await pdf_ingestion_service.load_pdfs_from_folder(str(pdf_dir))
             
             # Verify
-            assert stats["total"] == 1
-            assert stats["success"] == 1
+            assert stats["total"] == _N_PDFS
+            assert stats["success"] == _N_PDFS
+            assert mock_processor.extract_text_from_pdf.call_count == _N_PDFS
             
-            # Verify RAG service called
+            # Verify RAG service called once with the whole batch
             mock_add.assert_called_once()
             call_args = mock_add.call_args[0][0] # List of docs
-            assert len(call_args) == 1
-            assert call_args[0]["id"] == "pdf_test"
-            assert call_args[0]["content"] == "Extracted text content" * 10
+            assert len(call_args) == _N_PDFS
+            assert sorted(d["id"] for d in call_args) == sorted(f"pdf_test_{i}" for i in range(_N_PDFS))
+            assert all(d["content"] == "Extracted text content" * 10 for d in call_args)
+
+async def test_load_pdfs_from_folder_batches(pdf_dir):
+    with patch("app.services.pdf_ingestion_service.PDFProcessor") as MockPDFProcessor:
+        mock_processor = MockPDFProcessor.return_value
+        mock_processor.extract_text_from_pdf.return_value = ("Extracted text content" * 10, {})
+        mock_processor.classify_legal_document = AsyncMock(return_value={})
+
+        # The store reports one document per batch as already present
+        async def add(docs):
+            return {"added": len(docs) - 1}
+
+        with patch.object(rag_service, "add_documents", side_effect=add) as mock_add:
+            stats = await pdf_ingestion_service.load_pdfs_from_folder(str(pdf_dir), batch_size=5)
+
+            assert [len(c[0][0]) for c in mock_add.call_args_list] == [5, 5, 2]
+            assert stats["success"] == _N_PDFS - 3
+            assert stats["failed"] == 3
+
+async def test_load_pdfs_from_folder_batch_failure_falls_back(pdf_dir):
+    with patch("app.services.pdf_ingestion_service.PDFProcessor") as MockPDFProcessor:
+        mock_processor = MockPDFProcessor.return_value
+        mock_processor.extract_text_from_pdf.return_value = ("Extracted text content" * 10, {})
+        mock_processor.classify_legal_document = AsyncMock(return_value={})
+
+        # Whole batches are rejected; of the single adds only test_0 fails
+        async def add(docs):
+            if len(docs) > 1 or docs[0]["id"] == "pdf_test_0":
+                raise RuntimeError("store rejected the write")
+            return {"added": 1}
+
+        with patch.object(rag_service, "add_documents", side_effect=add):
+            stats = await pdf_ingestion_service.load_pdfs_from_folder(str(pdf_dir))
+
+            assert stats["success"] == _N_PDFS - 1
+            assert stats["failed"] == 1
+
+@pytest.mark.parametrize("batch_size", [0, -1])
+async def test_load_pdfs_rejects_bad_batch_size(pdf_dir, batch_size):
+    with pytest.raises(ValueError):
+        await pdf_ingestion_service.load_pdfs_from_folder(str(pdf_dir), batch_size=batch_size)
 
-@pytest.mark.asyncio
 async def test_load_pdfs_no_folder():
     stats = await pdf_ingestion_service.load_pdfs_from_folder("/non/existent/path")
     assert stats["total"] == 0
 
-@pytest.mark.asyncio
-async def test_load_pdfs_empty_file(tmp_path):
-    pdf_dir = tmp_path / "pdfs"
-    pdf_dir.mkdir()
-    pdf_file = pdf_dir / "empty.pdf"
-    pdf_file.write_bytes(b"")
+async def test_load_pdfs_empty_file():
+    # The folder and its one file exist only as stubs and the read is served
+    # from memory, so nothing touches disk
+    pdf_file = MagicMock(stem="empty")
+    pdf_file.name = "empty.pdf"
 
-    with patch("app.services.pdf_ingestion_service.PDFProcessor") as MockPDFProcessor:
+    with patch.object(pdf_ingestion_service, "Path") as MockPath, \
+            patch.object(pdf_ingestion_service, "PDFProcessor") as MockPDFProcessor, \
+            patch("app.services.pdf_ingestion_service.open", mock_open(read_data=b""), create=True):
+        MockPath.return_value.exists.return_value = True
+        MockPath.return_value.glob.return_value = [pdf_file]
         mock_processor = MockPDFProcessor.return_value
         # Return empty text
         mock_processor.extract_text_from_pdf.return_value = ("", {})
         mock_processor.classify_legal_document = AsyncMock(return_value={})
-        
-        stats = await pdf_ingestion_service.load_pdfs_from_folder(str(pdf_dir))
-        
+
+        stats = await pdf_ingestion_service.load_pdfs_from_folder("pdfs")
+
         assert stats["total"] == 1
         assert stats["skipped"] == 1 # Should be skipped due to < 100 chars
+        mock_processor.extract_text_from_pdf.assert_called_once_with(b"")
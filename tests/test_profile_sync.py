@@ -0,0 +1,70 @@
+import asyncio
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.user import User
+from app.services.auth_service import AuthService
+from app.services.firebase_service import FirebaseService
+
+pytestmark = pytest.mark.asyncio
+
+# Token carrying the NEW name; both cases sign in with it
+_TOKEN = {
+    "uid": "test_uid",
+    "email": "test@example.com",
+    "name": "New Name",
+    "picture": "old.jpg",
+    "email_verified": True
+}
+
+
+@pytest.fixture(scope="module")
+def auth_service_cls():
+    """AuthService with token verification and minting patched once for the module.
+
+    The module is imported up front; the patches only swap attributes it
+    already defines, so a renamed target still fails loudly.
+    """
+    with ExitStack() as stack:
+        mock_verify = stack.enter_context(patch("app.services.auth_service.verify_id_token"))
+        stack.enter_context(patch("app.services.auth_service.firebase_service"))
+        mock_create_token_pair = stack.enter_context(patch("app.services.auth_service.create_token_pair"))
+
+        mock_verify.return_value = _TOKEN
+        mock_create_token_pair.return_value = {"access_token": "a", "refresh_token": "r"}
+        yield AuthService
+
+
+def _existing_user(display_name):
+    return User(
+        uid="test_uid",
+        email="test@example.com",
+        display_name=display_name,
+        role="citizen",
+        profile_picture="old.jpg"
+    )
+
+
+async def test_profile_sync(auth_service_cls):
+    """A NEW name in the token updates the profile; a matching token does not"""
+    old_name, new_name = _existing_user("Old Name"), _existing_user("New Name")
+    # One spec-bound mock serves both sign-ins; each lookup pops the next user
+    mock_firebase = MagicMock(spec=FirebaseService)
+    mock_firebase.get_user_by_uid = AsyncMock(side_effect=[old_name, new_name])
+    mock_firebase.update_user_profile = AsyncMock()
+    mock_firebase.update_user = AsyncMock()
+
+    service = auth_service_cls()
+    service.firebase = mock_firebase
+    await asyncio.gather(
+        service.authenticate_with_social_provider("dummy_token"),
+        service.authenticate_with_social_provider("dummy_token"),
+    )
+
+    # Only the stale "Old Name" profile is written back
+    assert mock_firebase.get_user_by_uid.await_count == 2
+    mock_firebase.update_user_profile.assert_awaited_once_with(
+        "test_uid", {"displayName": "New Name"}
+    )
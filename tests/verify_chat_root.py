@@ -1,21 +1,28 @@
+"""Check that the chat session route is mounted.
 
-import requests
+Run from the repository root: ``python -m tests.verify_chat_root``.
+"""
+import asyncio
 import sys
 
-BASE_URL = "http://127.0.0.1:8000"
+import httpx
+
+from app.main import app
+
+
+async def _post(url, payload):
+    # Drive the app in-process; no server needs to be listening
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(url, json=payload)
+
 
 def test_chat_root():
-    url = f"{BASE_URL}/api/chat"
+    # Creating a session requires auth, so an anonymous probe gets 401/403
+    # when the route exists and 404 when it is missing
+    url = "/api/chat/sessions"
     try:
-        # Note: Depending on auth setup, this might fail with 401 if we don't assume a mock user or similar.
-        # However, looking at the code `user: Optional[dict] = Depends(get_current_user)`, it seems optional? 
-        # Wait, usually `get_current_user` raises 401 if not found. 
-        # Let's check `app/dependencies.py` to see if get_current_user enforces auth.
-        # If it does, we might get a 401 instead of 404, which is still progress (route found).
-        # But if the user is Optional in the router function, maybe it depends on the dependency implementation.
-        
-        # Let's try sending a request.
-        response = requests.post(url, json={})
+        response = asyncio.run(_post(url, {}))
         
         print(f"POST {url} -> Status: {response.status_code}")
         print(f"Response: {response.text}")
@@ -31,8 +38,8 @@ def test_chat_root():
             else:
                 print("FAILURE: JSON missing sessionId")
                 sys.exit(1)
-        elif response.status_code == 401:
-            print("SUCCESS (Partial): 401 Unauthorized means the route exists!")
+        elif response.status_code in [401, 403]:
+            print(f"SUCCESS (Partial): {response.status_code} means the route exists!")
             sys.exit(0)
         else:
             print(f"FAILURE: Unexpected status code {response.status_code}")